@@ -3,7 +3,7 @@ Full pipeline endpoint: Upload PDF → Parse → Validate → Draft responses.
 Includes both synchronous and SSE streaming variants.
 """
 import asyncio
-import json
+import orjson
 import os
 import queue
 import tempfile
@@ -28,7 +28,7 @@ logger = logging.getLogger(__name__)
 
 def _sse_event(event: str, data: dict) -> str:
     """Format a single SSE event."""
-    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+    return f"event: {event}\ndata: {orjson.dumps(jsonable_encoder(data)).decode()}\n\n"
 
 
 @router.post("/pipeline/run")
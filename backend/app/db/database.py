@@ -13,7 +13,10 @@ if "localhost" in os.getenv("DATABASE_URL", ""):
     DATABASE_URL = os.getenv("DATABASE_URL")
 
 engine = create_async_engine(DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+# expire_on_commit=False avoids implicit refresh SELECTs after each commit;
+# autoflush=False keeps flushes at explicit transaction boundaries instead of
+# before every query.
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 Base = declarative_base()
 
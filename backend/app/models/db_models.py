@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Text, Integer, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from sqlalchemy import JSON
 
 from app.db.database import Base
@@ -17,8 +17,10 @@ class KnowledgeChunkDB(Base):
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
     metadata_json = Column(JSON, nullable=True) # E.g., article/section numbers, effective dates
-    # text-embedding-004 output dimension is 768
-    embedding = Column(Vector(768), nullable=False) 
+    # text-embedding-004 output dimension is 768. Stored as halfvec
+    # (fp16): half the bytes of vector(768) per row, so scans move half
+    # the bandwidth, at no measurable recall cost for cosine search.
+    embedding = Column(HALFVEC(768), nullable=False)
 
 class PermitSessionDB(Base):
     __tablename__ = "permit_sessions"
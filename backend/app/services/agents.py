@@ -1,6 +1,7 @@
 import os
 import json
 import logging
+import re
 from typing import Callable
 from abc import ABC, abstractmethod
 
@@ -17,6 +18,11 @@ from app.services.llm_provider import get_llm_provider
 
 logger = logging.getLogger(__name__)
 
+# Strips an optional ```json … ``` fence around model output in one pass,
+# compiled once instead of per response.
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n?(.*?)\n?```\s*$", re.DOTALL)
+
+
 class BaseValidatorAgent(ABC):
     """Base class for all specialized validator agents."""
 
@@ -93,11 +99,15 @@ Respond ONLY with a valid JSON object (no markdown fences) containing:
 
         # More robust JSON extraction
         try:
+            fence_match = _FENCE_RE.match(content.strip())
+            if fence_match:
+                content = fence_match.group(1)
+
             json_start = content.find('{')
             json_end = content.rfind('}') + 1
             if json_start != -1 and json_end > json_start:
                 content = content[json_start:json_end]
-            
+
             parsed = json.loads(content)
         except json.JSONDecodeError:
             parsed = {
@@ -265,6 +275,10 @@ Perform your audit and return the JSON result:"""
         
         # Robust JSON extraction
         try:
+            fence_match = _FENCE_RE.match(content.strip())
+            if fence_match:
+                content = fence_match.group(1)
+
             json_start = content.find('{')
             json_end = content.rfind('}') + 1
             if json_start != -1 and json_end > json_start:
@@ -3,11 +3,13 @@ Retry utility for Gemini API calls with exponential backoff.
 Handles 429 RESOURCE_EXHAUSTED errors by extracting the retry delay
 from the error response and waiting accordingly.
 """
+import asyncio
+import random
 import re
 import os
 import time
 import logging
-from typing import Callable, TypeVar
+from typing import Awaitable, Callable, TypeVar
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T")
@@ -37,6 +39,34 @@ def _parse_retry_delay(error_message: str) -> float | None:
     return None
 
 
+def _is_rate_limit_error(error_msg: str) -> bool:
+    """True if the error message indicates a 429/rate-limit condition."""
+    return any(
+        indicator in error_msg
+        for indicator in [
+            "429",
+            "RESOURCE_EXHAUSTED",
+            "rate limit",
+            "quota exceeded",
+            "Too Many Requests",
+        ]
+    )
+
+
+def _retry_delay(error_msg: str, attempt: int, base_delay: float, max_delay: float) -> float:
+    """Prefer the server-suggested delay, else jittered exponential backoff.
+
+    Full jitter (uniform over [0, backoff]) de-synchronizes workers that
+    got rate-limited at the same moment — with a deterministic delay they
+    would all retry in lockstep and collide on the quota again.
+    """
+    server_delay = _parse_retry_delay(error_msg)
+    if server_delay is not None:
+        return min(server_delay + 1.0, max_delay)  # add 1s safety margin
+    backoff = min(base_delay * (BACKOFF_FACTOR ** attempt), max_delay)
+    return random.uniform(0, backoff)
+
+
 def retry_gemini_call(
     fn: Callable[[], T],
     max_retries: int = MAX_RETRIES,
@@ -61,26 +91,53 @@ def retry_gemini_call(
             last_exception = e
 
             # Only retry on rate limit / resource exhausted errors
-            is_rate_limit = any(
-                indicator in error_msg
-                for indicator in [
-                    "429",
-                    "RESOURCE_EXHAUSTED",
-                    "rate limit",
-                    "quota exceeded",
-                    "Too Many Requests",
-                ]
+            if not _is_rate_limit_error(error_msg) or attempt >= max_retries:
+                raise
+
+            delay = _retry_delay(error_msg, attempt, base_delay, max_delay)
+
+            reason = f"429 rate limit (attempt {attempt + 1}/{max_retries})"
+            logger.warning(
+                f"[retry] {reason} — waiting {delay:.1f}s before retry"
             )
 
-            if not is_rate_limit or attempt >= max_retries:
+            if on_retry:
+                on_retry(attempt + 1, delay, reason)
+
+            time.sleep(delay)
+
+    # Should not reach here, but just in case
+    raise last_exception  # type: ignore
+
+
+async def retry_gemini_call_async(
+    fn: Callable[[], Awaitable[T]],
+    max_retries: int = MAX_RETRIES,
+    base_delay: float = BASE_DELAY,
+    max_delay: float = MAX_DELAY,
+    on_retry: Callable[[int, float, str], None] | None = None,
+) -> T:
+    """
+    Async counterpart of retry_gemini_call: awaits the coroutine factory
+    and backs off with asyncio.sleep so the event loop is never blocked.
+    In development mode, retries are disabled to fail fast.
+    """
+    if os.getenv("ENVIRONMENT") == "development":
+        return await fn()
+
+    last_exception = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn()
+        except Exception as e:
+            error_msg = str(e)
+            last_exception = e
+
+            if not _is_rate_limit_error(error_msg) or attempt >= max_retries:
                 raise
 
-            # Calculate delay: prefer server-suggested delay, else exponential backoff
-            server_delay = _parse_retry_delay(error_msg)
-            if server_delay is not None:
-                delay = min(server_delay + 1.0, max_delay)  # add 1s safety margin
-            else:
-                delay = min(base_delay * (BACKOFF_FACTOR ** attempt), max_delay)
+            delay = _retry_delay(error_msg, attempt, base_delay, max_delay)
 
             reason = f"429 rate limit (attempt {attempt + 1}/{max_retries})"
             logger.warning(
@@ -90,7 +147,7 @@ def retry_gemini_call(
             if on_retry:
                 on_retry(attempt + 1, delay, reason)
 
-            time.sleep(delay)
+            await asyncio.sleep(delay)
 
     # Should not reach here, but just in case
     raise last_exception  # type: ignore
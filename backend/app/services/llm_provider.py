@@ -1,11 +1,12 @@
+import asyncio
+import functools
+import hashlib
 import os
+import time
 import logging
 from abc import ABC, abstractmethod
 from typing import Callable, Any
-from google import genai
-from google.genai import types as genai_types
-from openai import OpenAI
-from app.services.gemini_retry import retry_gemini_call
+from app.services.gemini_retry import retry_gemini_call, retry_gemini_call_async
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +15,23 @@ class LLMProvider(ABC):
     def generate_content(self, prompt: str, system_prompt: str = "", on_retry: Callable[[int, float, str], None] | None = None) -> str:
         pass
 
+    async def agenerate_content(self, prompt: str, system_prompt: str = "", on_retry: Callable[[int, float, str], None] | None = None) -> str:
+        """Async variant; providers without a native async client run the
+        sync implementation in a worker thread."""
+        return await asyncio.to_thread(self.generate_content, prompt, system_prompt, on_retry)
+
 class GeminiProvider(LLMProvider):
+    # Context-cache entries are created with this TTL and recreated a
+    # margin before it elapses — the provider instance is memoized
+    # process-wide, so a name cached forever would go stale after an
+    # hour of uptime and every call referencing it would fail.
+    _CONTEXT_CACHE_TTL_SECONDS = 3600.0
+    _CONTEXT_CACHE_REFRESH_MARGIN = 300.0
+
     def __init__(self, model: str = "gemini-3-flash-preview"):
+        # Imported here so workers only pay for the SDK they actually use
+        from google import genai
+
         self.model = model
         api_key = os.getenv("GOOGLE_API_KEY", "")
         project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "")
@@ -34,19 +50,73 @@ class GeminiProvider(LLMProvider):
         else:
             self.client = genai.Client(api_key=api_key) if api_key else None
 
+        # Explicit context caches by system-prompt hash (opt-in via
+        # GEMINI_CONTEXT_CACHE=1): repeated static prefixes like the
+        # grader persona are uploaded once and referenced by name, so
+        # they aren't re-billed or re-prefilled on every call. Maps the
+        # prompt hash to (cache name, monotonic refresh deadline); ""
+        # after a failed attempt so creation isn't retried per call.
+        self._context_caches: dict[str, tuple[str, float]] = {}
+
+    def _cached_content_name(self, system_prompt: str) -> str | None:
+        """Returns the cache name to reference for this system prompt, or
+        None when caching is disabled, unavailable, or failed. Entries are
+        recreated once their server-side TTL is close to elapsing."""
+        if not system_prompt or os.getenv("GEMINI_CONTEXT_CACHE") != "1":
+            return None
+
+        key = hashlib.sha256(system_prompt.encode()).hexdigest()
+        entry = self._context_caches.get(key)
+        if entry is not None:
+            name, refresh_at = entry
+            if time.monotonic() < refresh_at:
+                return name or None
+
+        from google.genai import types as genai_types
+
+        ttl = self._CONTEXT_CACHE_TTL_SECONDS
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=genai_types.CreateCachedContentConfig(
+                    system_instruction=system_prompt,
+                    ttl=f"{int(ttl)}s",
+                ),
+            )
+            name = cache.name
+        except Exception as e:
+            # Short prompts are below the caching minimum; fall back to
+            # sending the prompt inline and remember the failure for the
+            # same window so creation isn't retried every call.
+            logger.warning(f"Context cache creation failed, sending prompt inline: {e}")
+            name = ""
+        self._context_caches[key] = (
+            name,
+            time.monotonic() + ttl - self._CONTEXT_CACHE_REFRESH_MARGIN,
+        )
+        return name or None
+
     def generate_content(self, prompt: str, system_prompt: str = "", on_retry: Callable[[int, float, str], None] | None = None) -> str:
         if not self.client:
             raise RuntimeError("GOOGLE_API_KEY not set for GeminiProvider")
 
+        from google.genai import types as genai_types
+
+        cached_content = self._cached_content_name(system_prompt)
+
         def _call():
-            contents = prompt
-            if system_prompt:
-                contents = f"{system_prompt}\\n\\n{prompt}"
-            
+            # Pass the static instructions as system_instruction so Google
+            # can apply implicit prompt caching to the stable prefix —
+            # unless an explicit context cache already holds them.
+            config = genai_types.GenerateContentConfig(
+                temperature=0.1,
+                system_instruction=None if cached_content else (system_prompt or None),
+                cached_content=cached_content,
+            )
             return self.client.models.generate_content(
                 model=self.model,
-                contents=contents,
-                config=genai_types.GenerateContentConfig(temperature=0.1),
+                contents=prompt,
+                config=config,
             )
 
         response = retry_gemini_call(
@@ -55,8 +125,35 @@ class GeminiProvider(LLMProvider):
         )
         return response.text.strip()
 
+    async def agenerate_content(self, prompt: str, system_prompt: str = "", on_retry: Callable[[int, float, str], None] | None = None) -> str:
+        if not self.client:
+            raise RuntimeError("GOOGLE_API_KEY not set for GeminiProvider")
+
+        from google.genai import types as genai_types
+
+        cached_content = self._cached_content_name(system_prompt)
+
+        async def _call():
+            config = genai_types.GenerateContentConfig(
+                temperature=0.1,
+                system_instruction=None if cached_content else (system_prompt or None),
+                cached_content=cached_content,
+            )
+            # Native async client — no worker thread, requests overlap on
+            # the event loop up to the provider rate limit.
+            return await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=config,
+            )
+
+        response = await retry_gemini_call_async(_call, on_retry=on_retry)
+        return response.text.strip()
+
 class OpenRouterProvider(LLMProvider):
     def __init__(self, model: str = "anthropic/claude-3-haiku"):
+        from openai import OpenAI
+
         self.model = model
         api_key = os.getenv("OPENROUTER_API_KEY", "")
         self.client = OpenAI(
@@ -91,10 +188,13 @@ class OpenRouterProvider(LLMProvider):
                 time.sleep(2 ** attempt)
         return ""
 
-def get_llm_provider() -> LLMProvider:
-    provider_type = os.getenv("LLM_PROVIDER", "gemini").lower()
-    model = os.getenv("LLM_MODEL")
-
+@functools.lru_cache(maxsize=None)
+def _build_provider(provider_type: str, model: str | None) -> LLMProvider:
+    """One provider instance per (type, model) pair — the underlying SDK
+    client carries auth state and a connection pool, so rebuilding it for
+    every call site pays repeated TLS handshakes for nothing. Memoized on
+    the explicit arguments (not the env) so agents that flip LLM_MODEL
+    still get their own instance."""
     if provider_type == "gemini":
         # Supports native Gemini and Vertex partner models like claude-opus-4-6
         return GeminiProvider(model=model or "gemini-3-flash-preview")
@@ -103,3 +203,8 @@ def get_llm_provider() -> LLMProvider:
     else:
         logger.warning(f"Unknown LLM_PROVIDER '{provider_type}', falling back to Gemini")
         return GeminiProvider()
+
+def get_llm_provider() -> LLMProvider:
+    provider_type = os.getenv("LLM_PROVIDER", "gemini").lower()
+    model = os.getenv("LLM_MODEL")
+    return _build_provider(provider_type, model)
@@ -21,10 +21,12 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch, mm
 from reportlab.platypus import (
+    BaseDocTemplate,
+    Frame,
     HRFlowable,
     PageBreak,
+    PageTemplate,
     Paragraph,
-    SimpleDocTemplate,
     Spacer,
     Table,
     TableStyle,
@@ -124,26 +126,47 @@ def _styles():
     return ss
 
 
+# Footer geometry and static text — computed once, used on every page of
+# every generated PDF.
+_FOOTER_X = letter[0] / 2
+_FOOTER_Y1, _FOOTER_Y2, _FOOTER_RULE_Y = 0.5 * inch, 0.38 * inch, 0.62 * inch
+_FOOTER_LINE_X1 = 0.75 * inch
+_FOOTER_LINE_X2 = letter[0] - 0.75 * inch
+_FOOTER_STATIC_LINE = (
+    "AI-generated document. Professional review required before submission to Toronto Building."
+)
+
+
 def _footer(canvas, doc):
     """Draw persistent footer on every page."""
     canvas.saveState()
     canvas.setFont("Helvetica", 7)
     canvas.setFillColor(TEXT_MUTED)
     canvas.drawCentredString(
-        letter[0] / 2, 0.5 * inch,
+        _FOOTER_X, _FOOTER_Y1,
         f"PermitPulse Toronto — Resubmission Package — Page {doc.page}"
     )
-    canvas.drawCentredString(
-        letter[0] / 2, 0.38 * inch,
-        "AI-generated document. Professional review required before submission to Toronto Building."
-    )
+    canvas.drawCentredString(_FOOTER_X, _FOOTER_Y2, _FOOTER_STATIC_LINE)
     # Thin blue rule
     canvas.setStrokeColor(CITY_BLUE)
     canvas.setLineWidth(0.5)
-    canvas.line(0.75 * inch, 0.62 * inch, letter[0] - 0.75 * inch, 0.62 * inch)
+    canvas.line(_FOOTER_LINE_X1, _FOOTER_RULE_Y, _FOOTER_LINE_X2, _FOOTER_RULE_Y)
     canvas.restoreState()
 
 
+def _page_template() -> PageTemplate:
+    """Fresh frame/template pair for one build. ReportLab mutates Frame
+    coordinates during layout, so these must not be shared between
+    builds that could ever run concurrently; construction cost is
+    negligible next to doc.build."""
+    frame = Frame(
+        0.75 * inch, 0.85 * inch,
+        letter[0] - 1.5 * inch, letter[1] - 1.6 * inch,
+        id="main",
+    )
+    return PageTemplate(id="pkg", frames=[frame], onPage=_footer)
+
+
 class ResubmissionPackageGenerator:
     """Generates a PDF resubmission package from pipeline results."""
 
@@ -155,14 +178,8 @@ class ResubmissionPackageGenerator:
     def generate(self) -> bytes:
         """Returns the PDF as bytes."""
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=0.75 * inch,
-            leftMargin=0.75 * inch,
-            topMargin=0.75 * inch,
-            bottomMargin=0.85 * inch,
-        )
+        doc = BaseDocTemplate(buffer, pagesize=letter)
+        doc.addPageTemplates([_page_template()])
 
         story = []
         story += self._cover_letter()
@@ -172,7 +189,7 @@ class ResubmissionPackageGenerator:
         story += self._revision_summary()
         story += self._disclaimer()
 
-        doc.build(story, onFirstPage=_footer, onLaterPages=_footer)
+        doc.build(story)
         return buffer.getvalue()
 
     # ── Cover Letter ────────────────────────────────────────────────────
@@ -1,10 +1,17 @@
+import asyncio
 import fitz  # PyMuPDF
+import hashlib
 import json
+import multiprocessing
+import orjson
+import re
 import uuid
 import os
 import logging
+import io
+from functools import cached_property
 from io import BytesIO
-from typing import List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from uuid import UUID, uuid4
 
 from app.models.domain import DeficiencyCategory, DeficiencyItem
@@ -12,31 +19,32 @@ from app.services.llm_provider import get_llm_provider
 
 logger = logging.getLogger(__name__)
 
-class ExaminerNoticeParserService:
-    def __init__(self, api_key: Optional[str] = None):
-        self.provider = get_llm_provider()
+# Optional SIMD-accelerated JSON parser; the module-level Parser reuses its
+# internal buffers across responses. Falls back to orjson when absent.
+try:
+    import simdjson
+    _SIMDJSON_PARSER = simdjson.Parser()
+except ImportError:
+    simdjson = None
+    _SIMDJSON_PARSER = None
 
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extracts raw text from an Examiner's Notice PDF using PyMuPDF."""
-        doc = fitz.open(pdf_path)
-        full_text = []
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
-            text = page.get_text("text")
-            full_text.append(text)
-        doc.close()
-        return "\n".join(full_text)
+# Strips an optional ```json … ``` fence around the model output in one pass.
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n?(.*?)\n?```\s*$", re.DOTALL)
 
-    def parse_examiner_notice(
-        self, session_id: UUID, pdf_path: str, on_retry: Optional[Callable] = None
-    ) -> List[DeficiencyItem]:
-        """
-        Extracts text from PDF and uses LLM to structure the deficiencies.
-        """
-        raw_text = self.extract_text_from_pdf(pdf_path)
-        
-        system_prompt = "You are an expert at parsing City of Toronto Building Examiner's Notices."
-        prompt = f"""Extract every deficiency item from the notice text below.
+# Markers that indicate a notice actually lists deficiencies (section
+# headers like "SECTION A" or item codes like "A-1" / "OBC-2"). Notices
+# without any of these don't need an LLM round-trip.
+_DEFICIENCY_MARKER_RE = re.compile(r"SECTION\s+[A-Z]\b|\b[A-Z]{1,3}-\d", re.IGNORECASE)
+
+# Anything shorter than this can't contain a real deficiency section.
+_MIN_NOTICE_LENGTH = 200
+
+# All static instructions live in the system prompt so providers with
+# prompt caching (Gemini system_instruction) only bill/process them once;
+# the per-call user prompt carries nothing but the notice text.
+_SYSTEM_PROMPT = """You are an expert at parsing City of Toronto Building Examiner's Notices.
+
+Extract every deficiency item from the notice text provided by the user.
 
 Return a JSON array of deficiency items. Each item must have:
 - "category": one of exactly: ZONING, OBC, FIRE_ACCESS, TREE_PROTECTION, LANDSCAPING, SERVICING, OTHER
@@ -45,29 +53,409 @@ Return a JSON array of deficiency items. Each item must have:
 
 Rules:
 - Return ONLY the JSON array, no markdown, no code fences, no explanation
-- Map section letters to categories: A/Zoning→ZONING, B/OBC/Building Code→OBC, C/Tree→TREE_PROTECTION, D/Fire→FIRE_ACCESS, E/Landscape→LANDSCAPING, F/Servicing→SERVICING
+- Map section letters to categories: A/Zoning→ZONING, B/OBC/Building Code→OBC, C/Tree→TREE_PROTECTION, D/Fire→FIRE_ACCESS, E/Landscape→LANDSCAPING, F/Servicing→SERVICING"""
+
+_BATCH_SYSTEM_PROMPT = """You are an expert at parsing City of Toronto Building Examiner's Notices.
 
-Here is the Examiner's Notice text:
-<notice>
+Extract every deficiency item from each of the notices provided by the user, wrapped in <document id="..."> delimiters.
+
+Return a single JSON object mapping each document id to its array of deficiency items. Each item must have:
+- "category": one of exactly: ZONING, OBC, FIRE_ACCESS, TREE_PROTECTION, LANDSCAPING, SERVICING, OTHER
+- "raw_notice_text": the full original text of the deficiency as written in the notice
+- "extracted_action": a concise 1-2 sentence summary of what the applicant must do to resolve it
+
+Rules:
+- Return ONLY the JSON object, no markdown, no code fences, no explanation
+- Map section letters to categories: A/Zoning→ZONING, B/OBC/Building Code→OBC, C/Tree→TREE_PROTECTION, D/Fire→FIRE_ACCESS, E/Landscape→LANDSCAPING, F/Servicing→SERVICING"""
+
+# Character budget per batched request: keeps the packed notices well
+# inside the model context while leaving room for the JSON response.
+_BATCH_CHAR_BUDGET = 400_000
+
+# User-prompt template shared by the sync and async parse paths.
+_PROMPT_TEMPLATE = """<notice>
 {raw_text}
 </notice>
 
 Return only the JSON array:"""
 
+# Below this page count the Pool startup overhead outweighs the speedup.
+_MIN_PAGES_FOR_POOL = 4
+
+# LLM consumption tolerates raw stream order, so skip the per-page layout
+# sort; keep whitespace and rejoin hyphenated words across line breaks.
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_DEHYPHENATE
+
+# Single hash probe per item instead of Enum() + exception control flow.
+_CAT_MAP = {c.value: c for c in DeficiencyCategory}
+
+# Parsed-deficiency cache: identical PDFs (common while applicants iterate)
+# skip both text extraction and the multi-second LLM call. Bump the version
+# whenever the extraction prompt changes so stale entries are invalidated.
+_PROMPT_VERSION = "v1"
+_PARSE_CACHE_DIR = os.path.join(".cache", "parsed_notices")
+
+# Extracted-text cache: unlike the parsed-deficiency cache above, raw text
+# survives prompt/model changes, so a reparse after a prompt bump still
+# skips the PyMuPDF render. Keyed by PDF content hash alone.
+_TEXT_CACHE_DIR = os.path.join(".cache", "pdftext")
+
+
+def _pdf_sha256(pdf_path: str) -> str:
+    """Streams the PDF through sha256 in 64KB chunks."""
+    hasher = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        while chunk := f.read(65536):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _parse_cache_key(pdf_path: str) -> str:
+    """Cache key covering PDF content, model and prompt version."""
+    model = os.getenv("LLM_MODEL", "")
+    return hashlib.sha256(
+        f"{_pdf_sha256(pdf_path)}|{model}|{_PROMPT_VERSION}".encode()
+    ).hexdigest()
+
+
+def _parse_cache_get(key: str) -> Optional[list]:
+    path = os.path.join(_PARSE_CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _parse_cache_set(key: str, items_data: list) -> None:
+    try:
+        os.makedirs(_PARSE_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_PARSE_CACHE_DIR, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(items_data))
+        os.replace(tmp_path, path)  # atomic on POSIX
+    except OSError as e:
+        logger.debug(f"[parser] Failed to write parse cache: {e}")
+
+
+def _text_cache_get(pdf_sha: str) -> Optional[str]:
+    path = os.path.join(_TEXT_CACHE_DIR, f"{pdf_sha}.txt")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _text_cache_set(pdf_sha: str, text: str) -> None:
+    try:
+        os.makedirs(_TEXT_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_TEXT_CACHE_DIR, f"{pdf_sha}.txt")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)  # atomic on POSIX
+    except OSError as e:
+        logger.debug(f"[parser] Failed to write text cache: {e}")
+
+
+def _extract_page_range(args: tuple) -> tuple:
+    """Pool worker: extract text for a contiguous page range.
+
+    Re-opens the PDF in the worker because fitz documents can't be pickled.
+    Returns (start_page, text) so the parent can reassemble in order.
+    """
+    pdf_path, start, stop = args
+    parts = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc.pages(start, stop):
+            parts.append(page.get_text("text", flags=_TEXT_FLAGS, sort=False))
+    return start, "\n".join(parts)
+
+class ExaminerNoticeParserService:
+    def __init__(self, api_key: Optional[str] = None):
+        # Kept for backward compatibility with older call sites; the
+        # provider reads credentials from the environment.
+        self._api_key = api_key
+
+    @cached_property
+    def provider(self):
+        """LLM provider, created on first use. Requests served from the
+        parse cache or short-circuited as empty never pay for the provider
+        handshake."""
+        return get_llm_provider()
+
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extracts raw text from an Examiner's Notice PDF.
+
+        The backend is selected with the PDF_BACKEND env var: "pdfium"
+        uses pypdfium2 (noticeably faster on large documents, optional
+        dependency), anything else falls back to PyMuPDF.
+
+        Extracted text is cached on disk by PDF content hash, so re-runs
+        on the same bytes return without opening the document at all.
+        """
+        pdf_sha = _pdf_sha256(pdf_path)
+        cached_text = _text_cache_get(pdf_sha)
+        if cached_text is not None:
+            return cached_text
+
+        if os.getenv("PDF_BACKEND", "pymupdf").lower() == "pdfium":
+            try:
+                text = self._extract_with_pdfium(pdf_path)
+                _text_cache_set(pdf_sha, text)
+                return text
+            except ImportError:
+                logger.warning("[parser] pypdfium2 not installed, falling back to PyMuPDF")
+        text = self._extract_with_pymupdf(pdf_path)
+        _text_cache_set(pdf_sha, text)
+        return text
+
+    @staticmethod
+    def _extract_with_pdfium(pdf_path: str) -> str:
+        """pypdfium2 extraction path. Raises ImportError if unavailable."""
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(parts)
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _extract_with_pymupdf(pdf_path: str) -> str:
+        """PyMuPDF extraction path.
+
+        Multi-page notices are split across a multiprocessing Pool — text
+        shaping is CPU-bound, so parallel workers cut wall time roughly by
+        min(pages, cpu_count). Short documents stay sequential to avoid
+        paying the Pool startup cost.
+        """
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            if page_count < _MIN_PAGES_FOR_POOL:
+                # Stream page text into one buffer instead of holding every
+                # page string plus the joined copy at peak.
+                buf = io.StringIO()
+                for page in doc.pages():
+                    buf.write(page.get_text("text", flags=_TEXT_FLAGS, sort=False))
+                    buf.write("\n")
+                return buf.getvalue()
+
+        workers = min(multiprocessing.cpu_count(), page_count)
+        pages_per_worker = -(-page_count // workers)  # ceil division
+        ranges = [
+            (pdf_path, start, min(start + pages_per_worker, page_count))
+            for start in range(0, page_count, pages_per_worker)
+        ]
+        # spawn, not the Linux default fork: this runs inside the live
+        # FastAPI process (via run_in_executor), and forking a
+        # multi-threaded process can deadlock children on locks held by
+        # other threads at fork time. The worker re-imports everything it
+        # needs, so spawn costs only interpreter startup.
+        with multiprocessing.get_context("spawn").Pool(processes=workers) as pool:
+            results = pool.map(_extract_page_range, ranges)
+        results.sort(key=lambda r: r[0])
+        return "\n".join(text for _, text in results)
+
+    def parse_examiner_notice(
+        self, session_id: UUID, pdf_path: str, on_retry: Optional[Callable] = None
+    ) -> List[DeficiencyItem]:
+        """
+        Extracts text from PDF and uses LLM to structure the deficiencies.
+        Results are cached on disk by PDF content hash so duplicate uploads
+        skip both extraction and the LLM round-trip.
+        """
+        cache_key = _parse_cache_key(pdf_path)
+        cached_items = _parse_cache_get(cache_key)
+        if cached_items is not None:
+            logger.info(f"[parser] Parse cache hit for {cache_key[:12]}…")
+            return self._build_deficiencies(session_id, cached_items)
+
+        raw_text = self.extract_text_from_pdf(pdf_path)
+
+        # Short-circuit empty/clean notices — a string scan is orders of
+        # magnitude cheaper than a Gemini call.
+        if len(raw_text) < _MIN_NOTICE_LENGTH or not _DEFICIENCY_MARKER_RE.search(raw_text):
+            logger.info("[parser] No deficiency section detected, skipping LLM call")
+            return []
+
+        # Static instructions live in _SYSTEM_PROMPT (cache-friendly);
+        # the user prompt carries only the dynamic notice text.
+        prompt = _PROMPT_TEMPLATE.format(raw_text=raw_text)
+
         if os.getenv("ENVIRONMENT") == "development":
             logger.debug(f"[parser] PROMPT:\n{prompt[:1000]}...")
 
         content = self.provider.generate_content(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_SYSTEM_PROMPT,
             on_retry=on_retry
         )
 
         if os.getenv("ENVIRONMENT") == "development":
             logger.debug(f"[parser] RESPONSE:\n{content[:1000]}...")
 
-        # More robust JSON extraction
+        return self._finish_parse(session_id, cache_key, content)
+
+    async def parse_examiner_notice_async(
+        self, session_id: UUID, pdf_path: str, on_retry: Optional[Callable] = None
+    ) -> List[DeficiencyItem]:
+        """
+        Async variant of parse_examiner_notice. The LLM call goes through
+        the provider's async client, so callers can overlap many notices
+        with asyncio.gather; text extraction runs in a worker thread.
+        """
+        cache_key = _parse_cache_key(pdf_path)
+        cached_items = _parse_cache_get(cache_key)
+        if cached_items is not None:
+            logger.info(f"[parser] Parse cache hit for {cache_key[:12]}…")
+            return self._build_deficiencies(session_id, cached_items)
+
+        raw_text = await asyncio.to_thread(self.extract_text_from_pdf, pdf_path)
+
+        if len(raw_text) < _MIN_NOTICE_LENGTH or not _DEFICIENCY_MARKER_RE.search(raw_text):
+            logger.info("[parser] No deficiency section detected, skipping LLM call")
+            return []
+
+        prompt = _PROMPT_TEMPLATE.format(raw_text=raw_text)
+
+        content = await self.provider.agenerate_content(
+            prompt=prompt,
+            system_prompt=_SYSTEM_PROMPT,
+            on_retry=on_retry
+        )
+
+        return self._finish_parse(session_id, cache_key, content)
+
+    def _finish_parse(
+        self, session_id: UUID, cache_key: str, content: str
+    ) -> List[DeficiencyItem]:
+        """Shared post-LLM path: extract JSON, cache, build items."""
         try:
+            items_data = self._extract_json_payload(content)
+        except json.JSONDecodeError:
+            logger.warning(f"[parser] JSON decode failed. Raw response:\n{content[:500]}")
+            return []
+        if not isinstance(items_data, list):
+            # A wrong-shape reply is as transient as a decode failure —
+            # caching it would pin "no deficiencies" for this PDF forever.
+            logger.warning(f"[parser] Expected list but got {type(items_data)}")
+            return []
+
+        _parse_cache_set(cache_key, items_data)
+
+        result = self._build_deficiencies(session_id, items_data)
+        logger.info("[parser] Extracted %d deficiencies from notice", len(result))
+        return result
+
+    def parse_examiner_notices_batch(
+        self,
+        items: List[Tuple[UUID, str]],
+        on_retry: Optional[Callable] = None,
+    ) -> Dict[UUID, List[DeficiencyItem]]:
+        """
+        Parses several Examiner's Notices in a single LLM request.
+
+        `items` is a list of (session_id, pdf_path) pairs. The notice texts
+        are greedily packed into as few requests as the character budget
+        allows, each wrapped in <document id="..."> delimiters; the model
+        returns one JSON object keyed by document id per request, so a
+        batch of N notices costs far fewer than N round-trips.
+        """
+        if not items:
+            return {}
+
+        results: Dict[UUID, List[DeficiencyItem]] = {}
+
+        # Serve parse-cache hits first so only misses are packed and
+        # billed — the single and batch paths share one cache, so a PDF
+        # parsed either way is never re-billed by the other.
+        misses: List[Tuple[UUID, str, str]] = []
+        for session_id, pdf_path in items:
+            cache_key = _parse_cache_key(pdf_path)
+            cached_items = _parse_cache_get(cache_key)
+            if cached_items is not None:
+                logger.info(f"[parser] Parse cache hit for {cache_key[:12]}…")
+                results[session_id] = self._build_deficiencies(session_id, cached_items)
+            else:
+                misses.append((session_id, pdf_path, cache_key))
+
+        if not misses:
+            return results
+        if len(misses) == 1:
+            session_id, pdf_path, _ = misses[0]
+            results[session_id] = self.parse_examiner_notice(session_id, pdf_path, on_retry)
+            return results
+
+        # Extract all texts up front, then greedy-pack into request groups.
+        texts = [
+            (session_id, self.extract_text_from_pdf(pdf_path), cache_key)
+            for session_id, pdf_path, cache_key in misses
+        ]
+
+        groups: List[List[Tuple[UUID, str, str]]] = [[]]
+        group_size = 0
+        for session_id, text, cache_key in texts:
+            if groups[-1] and group_size + len(text) > _BATCH_CHAR_BUDGET:
+                groups.append([])
+                group_size = 0
+            groups[-1].append((session_id, text, cache_key))
+            group_size += len(text)
+
+        for group in groups:
+            documents = "\n".join(
+                f'<document id="{session_id}">\n{text}\n</document>'
+                for session_id, text, _ in group
+            )
+            prompt = f"""Here are the Examiner's Notices:
+{documents}
+
+Return only the JSON object:"""
+
+            content = self.provider.generate_content(
+                prompt=prompt,
+                system_prompt=_BATCH_SYSTEM_PROMPT,
+                on_retry=on_retry
+            )
+
+            try:
+                by_document = self._extract_json_payload(content, expect_list=False)
+                if not isinstance(by_document, dict):
+                    logger.warning(f"[parser] Expected object but got {type(by_document)}")
+                    by_document = {}
+            except json.JSONDecodeError:
+                logger.warning(f"[parser] Batch JSON decode failed. Raw response:\n{content[:500]}")
+                by_document = {}
+
+            for session_id, _, cache_key in group:
+                items_data = by_document.get(str(session_id))
+                if isinstance(items_data, list):
+                    # Same rule as the single path: only successfully
+                    # parsed lists are cached, so a failed or wrong-shape
+                    # batch reply stays transient.
+                    _parse_cache_set(cache_key, items_data)
+                else:
+                    items_data = []
+                results[session_id] = self._build_deficiencies(session_id, items_data)
+        return results
+
+    @staticmethod
+    def _extract_json_payload(content: str, expect_list: bool = True):
+        """Pulls the JSON payload (list or object) out of an LLM response."""
+        # Drop a markdown fence if the model ignored the "no fences" rule
+        fence_match = _FENCE_RE.match(content.strip())
+        if fence_match:
+            content = fence_match.group(1)
+
+        if expect_list:
             # Try to find a JSON list first
             json_start = content.find('[')
             json_end = content.rfind(']') + 1
@@ -81,28 +469,53 @@ Return only the JSON array:"""
                     content_to_parse = content[json_start:json_end]
                 else:
                     content_to_parse = content
+        else:
+            json_start = content.find('{')
+            json_end = content.rfind('}') + 1
+            if json_start != -1 and json_end > json_start:
+                content_to_parse = content[json_start:json_end]
+            else:
+                content_to_parse = content
 
-            items_data = json.loads(content_to_parse)
-            
-            # If it's an object, try to unwrap "items" list
-            if isinstance(items_data, dict) and "items" in items_data:
-                items_data = items_data["items"]
-                
-            if not isinstance(items_data, list):
-                logger.warning(f"[parser] Expected list but got {type(items_data)}")
-                items_data = []
-        except json.JSONDecodeError:
-            print(f"[parser] JSON decode failed. Raw response:\n{content[:500]}")
-            return []
+        # simdjson when available (large responses with long raw_notice_text
+        # benefit most), else orjson — both raise subclasses of ValueError
+        # that callers' json.JSONDecodeError clauses still catch via the
+        # fallback below.
+        if _SIMDJSON_PARSER is not None:
+            try:
+                doc = _SIMDJSON_PARSER.parse(content_to_parse.encode())
+                # Materialize to plain containers for downstream use/caching.
+                # Bare scalars (e.g. the model replying "none") come back as
+                # Python primitives with neither accessor — pass them through
+                # so callers' isinstance checks degrade gracefully instead of
+                # hitting an AttributeError nobody catches.
+                if hasattr(doc, "as_list"):
+                    payload = doc.as_list()
+                elif hasattr(doc, "as_dict"):
+                    payload = doc.as_dict()
+                else:
+                    payload = doc
+            except ValueError:
+                # simdjson decode errors subclass ValueError; retry with
+                # orjson so the caller sees its usual JSONDecodeError.
+                payload = orjson.loads(content_to_parse)
+        else:
+            payload = orjson.loads(content_to_parse)
+
+        # If it's an object, try to unwrap "items" list
+        if expect_list and isinstance(payload, dict) and "items" in payload:
+            payload = payload["items"]
+        return payload
 
+    @staticmethod
+    def _build_deficiencies(session_id: UUID, items_data: list) -> List[DeficiencyItem]:
+        """Converts raw item dicts from the LLM into DeficiencyItem models."""
         result = []
+        skipped = []
         for idx, item in enumerate(items_data):
             try:
                 cat_str = item.get("category", "OTHER").upper()
-                try:
-                    category = DeficiencyCategory(cat_str)
-                except ValueError:
-                    category = DeficiencyCategory.OTHER
+                category = _CAT_MAP.get(cat_str, DeficiencyCategory.OTHER)
 
                 deficiency = DeficiencyItem(
                     session_id=session_id,
@@ -112,9 +525,10 @@ Return only the JSON array:"""
                     order_index=idx + 1,
                 )
                 result.append(deficiency)
-            except Exception as e:
-                print(f"[parser] Skipping item {idx}: {e}")
+            except Exception:
+                skipped.append(idx)
                 continue
-
-        print(f"[parser] Extracted {len(result)} deficiencies from notice")
+        if skipped:
+            # One aggregated record instead of a log line per bad item
+            logger.warning("[parser] Skipped %d malformed items: %s", len(skipped), skipped)
         return result
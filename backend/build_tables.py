@@ -1,10 +1,18 @@
 import asyncio
+from sqlalchemy import text
 from app.db.database import engine
 from app.models.db_models import Base
 
 async def init():
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
         await conn.run_sync(Base.metadata.create_all)
+        # ANN index over the fp16 embeddings; halfvec ops keep the index
+        # half the size of its vector(768) equivalent.
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS knowledge_chunks_embedding_idx "
+            "ON knowledge_chunks USING hnsw (embedding halfvec_cosine_ops);"
+        ))
 
 if __name__ == "__main__":
     asyncio.run(init())
@@ -9,10 +9,13 @@ from contextlib import asynccontextmanager
 
 from app.db.database import engine, Base
 from app.models.db_models import PermitSessionDB, DeficiencyItemDB
+from app.services.security import close_http_clients
 
 from sqlalchemy import text
 
+import asyncio
 import logging
+import os
 import sys
 
 # Configure logging
@@ -36,14 +39,37 @@ async def lifespan(app: FastAPI):
         else:
              logger.warning("Running in DEVELOPMENT mode without GOOGLE_API_KEY. Pipeline will fail.")
 
-    # Initialize DB tables on startup
-    async with engine.begin() as conn:
-        logger.info("Initializing database tables...")
-        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database initialization complete.")
+    # Schema init is a one-shot deploy step (build_tables.py). Running DDL
+    # introspection from every autoscaled worker adds seconds to cold start,
+    # so it only fires when explicitly requested.
+    if os.getenv("RUN_MIGRATIONS") == "1":
+        async with engine.begin() as conn:
+            logger.info("Initializing database tables...")
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+            await conn.run_sync(Base.metadata.create_all)
+            logger.info("Database initialization complete.")
+
+    # Pre-warm the connection pool so the first user-facing request hits an
+    # already-open connection instead of paying connect + TLS handshake.
+    try:
+        pool_size = engine.pool.size()
+    except AttributeError:
+        pool_size = 5
+    conns = await asyncio.gather(
+        *(engine.connect() for _ in range(pool_size)),
+        return_exceptions=True,
+    )
+    for conn in conns:
+        if isinstance(conn, Exception):
+            logger.warning(f"Pool warm-up connection failed: {conn}")
+        else:
+            await conn.close()
+
     yield
 
+    # Release pooled outbound connections on shutdown
+    await close_http_clients()
+
 app = FastAPI(
     title="Permit Pulse Toronto API",
     description="AI-powered permit correction response generator for Garden & Laneway Suites",
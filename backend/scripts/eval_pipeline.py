@@ -1,6 +1,8 @@
+import asyncio
 import os
 import json
 import logging
+import time
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 
@@ -17,15 +19,23 @@ from app.services.llm_provider import get_llm_provider
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-class EvalPipeline:
-    def __init__(self):
-        self.provider = get_llm_provider()
-        
-    def evaluate_response(self, original_deficiency: str, generated_response: Dict[str, Any], gold_standard_citations: List[str]) -> Dict[str, Any]:
-        """
-        Evaluates a generated response against the original deficiency and a gold standard.
-        """
-        system_prompt = """You are a senior Professional Engineer (P.Eng.) with over 10 years of experience specializing in City of Toronto building permit reviews, specifically for Garden Suites and Laneway Suites. 
+# Paces Gemini calls to the per-minute quota. Unlike the fixed sleeps it
+# replaces, this only waits for whatever is left of the interval since the
+# previous call, so back-to-back evals spend no dead time once the quota
+# allows it.
+_MIN_CALL_INTERVAL = 60.0 / float(os.getenv("GEMINI_RPM", "60"))
+_last_call_at = 0.0
+
+def _pace_gemini_call():
+    global _last_call_at
+    wait = _last_call_at + _MIN_CALL_INTERVAL - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    _last_call_at = time.monotonic()
+
+# Grader persona and criteria shared by the single and batched paths;
+# only the output-format tail differs.
+_EVAL_GRADER = """You are a senior Professional Engineer (P.Eng.) with over 10 years of experience specializing in City of Toronto building permit reviews, specifically for Garden Suites and Laneway Suites.
 
 You have deep technical knowledge of:
 - Toronto Zoning By-law 569-2013 (Section 150.7 and 150.8)
@@ -38,10 +48,9 @@ Your job is to rigorously evaluate an AI-generated correction response. You do n
 You must grade the response on three criteria:
 1. Citation Accuracy (Score 0-10): Did the response cite the exact By-law or OBC section required? Deduct points for missing subsections or fabricated numbers.
 2. Completeness (Score 0-10): Did the response fully address the examiner's deficiency with technical precision (e.g., providing calculated percentages or referring to specific drawing changes)?
-3. Professional Tone (Score 0-10): Is the response formatted professionally, with the authoritative tone of a BCIN-qualified designer or Architect?
+3. Professional Tone (Score 0-10): Is the response formatted professionally, with the authoritative tone of a BCIN-qualified designer or Architect?"""
 
-Return your evaluation strictly as a JSON object:
-{
+_EVAL_RESULT_SCHEMA = """{
     "citation_accuracy": <int>,
     "completeness": <int>,
     "professional_tone": <int>,
@@ -49,6 +58,51 @@ Return your evaluation strictly as a JSON object:
     "feedback": "<string explaining specific technical deductions based on Toronto regulations>"
 }"""
 
+_EVAL_SYSTEM_PROMPT = f"""{_EVAL_GRADER}
+
+Return your evaluation strictly as a JSON object:
+{_EVAL_RESULT_SCHEMA}"""
+
+_BATCH_EVAL_SYSTEM_PROMPT = f"""{_EVAL_GRADER}
+
+You will receive several numbered submissions. Grade each one independently.
+
+Return strictly a JSON array with exactly one evaluation object per submission, in submission order:
+{_EVAL_RESULT_SCHEMA}"""
+
+# Submissions packed per batched grading call — past this the per-call
+# latency growth cancels out the round-trip savings.
+_EVAL_BATCH_SIZE = 12
+
+# raw_decode stops at the end of the first complete JSON value, so
+# trailing prose (or a second JSON blob from batched grading) is ignored
+# without scanning the whole response for a closing brace.
+_JSON_DECODER = json.JSONDecoder()
+
+class EvalPipeline:
+    def __init__(self):
+        self.provider = get_llm_provider()
+        
+    def evaluate_response(self, original_deficiency: str, generated_response: Dict[str, Any], gold_standard_citations: List[str]) -> Dict[str, Any]:
+        """
+        Evaluates a generated response against the original deficiency and a gold standard.
+        """
+        system_prompt, prompt = self._build_eval_prompts(
+            original_deficiency, generated_response, gold_standard_citations
+        )
+        logger.info(f"Evaluating response for deficiency: {original_deficiency[:50]}...")
+
+        try:
+            _pace_gemini_call()
+            content = self.provider.generate_content(prompt=prompt, system_prompt=system_prompt)
+            return self._parse_eval_result(content)
+        except Exception as e:
+            return self._eval_error(e)
+
+    @staticmethod
+    def _build_eval_prompts(original_deficiency: str, generated_response: Dict[str, Any], gold_standard_citations: List[str]) -> tuple:
+        """Returns the (system_prompt, user_prompt) pair shared by the sync
+        and async evaluation paths."""
         prompt = f"""
 ### Original Examiner Deficiency:
 {original_deficiency}
@@ -64,36 +118,105 @@ Reasoning: {generated_response.get('agent_reasoning')}
 
 Evaluate the response and return the JSON object:"""
 
+        return _EVAL_SYSTEM_PROMPT, prompt
+
+    async def evaluate_response_async(self, original_deficiency: str, generated_response: Dict[str, Any], gold_standard_citations: List[str]) -> Dict[str, Any]:
+        """Async variant of evaluate_response — calls overlap on the event
+        loop, so a batch of evaluations finishes in roughly one call's
+        latency instead of the sum."""
+        system_prompt, prompt = self._build_eval_prompts(
+            original_deficiency, generated_response, gold_standard_citations
+        )
         logger.info(f"Evaluating response for deficiency: {original_deficiency[:50]}...")
-        
         try:
-            content = self.provider.generate_content(prompt=prompt, system_prompt=system_prompt)
-
-            # More robust JSON extraction
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                content = content[json_start:json_end]
-
-            result = json.loads(content)
-            logger.info(f"Evaluation complete. Pass: {result.get('overall_pass')}")
-            return result
+            content = await self.provider.agenerate_content(prompt=prompt, system_prompt=system_prompt)
+            return self._parse_eval_result(content)
         except Exception as e:
-            logger.error(f"Evaluation failed: {e}")
-            return {
-                "citation_accuracy": 0,
-                "completeness": 0,
-                "professional_tone": 0,
-                "overall_pass": False,
-                "feedback": f"Evaluation script error: {str(e)}"
-            }
+            return self._eval_error(e)
+
+    def evaluate_batch(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        """Grades many (deficiency, response, gold_citations) triples with
+        one LLM call per _EVAL_BATCH_SIZE submissions instead of one call
+        each. Falls back to per-item grading for any group whose batched
+        answer fails to parse."""
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(items), _EVAL_BATCH_SIZE):
+            group = items[start:start + _EVAL_BATCH_SIZE]
+            blocks = []
+            for n, (deficiency, response, gold_citations) in enumerate(group, 1):
+                blocks.append(f"""### Submission {n}:
+Original Examiner Deficiency:
+{deficiency}
+
+Expected Gold Standard Citations:
+{', '.join(gold_citations)}
+
+AI Generated Response to Evaluate:
+Draft Text: {response.get('draft_text')}
+Resolution Status: {response.get('resolution_status')}
+Citations Provided: {json.dumps(response.get('citations'))}
+Reasoning: {response.get('agent_reasoning')}""")
+
+            prompt = f"""Evaluate the following {len(group)} submissions.
+
+{chr(10).join(blocks)}
+
+Return the JSON array of {len(group)} evaluation objects:"""
+
+            logger.info(f"Evaluating batch of {len(group)} responses...")
+            group_results = None
+            try:
+                _pace_gemini_call()
+                content = self.provider.generate_content(
+                    prompt=prompt, system_prompt=_BATCH_EVAL_SYSTEM_PROMPT
+                )
+                json_start = content.find('[')
+                if json_start == -1:
+                    raise json.JSONDecodeError("No JSON array found", content, 0)
+                parsed, _ = _JSON_DECODER.raw_decode(content, json_start)
+                if isinstance(parsed, list) and len(parsed) == len(group):
+                    group_results = parsed
+                else:
+                    logger.warning(
+                        f"Batch grading returned {len(parsed) if isinstance(parsed, list) else type(parsed)} "
+                        f"for {len(group)} submissions; falling back to per-item grading"
+                    )
+            except Exception as e:
+                logger.warning(f"Batch grading failed ({e}); falling back to per-item grading")
+
+            if group_results is None:
+                group_results = [
+                    self.evaluate_response(deficiency, response, gold_citations)
+                    for deficiency, response, gold_citations in group
+                ]
+            results.extend(group_results)
+        return results
+
+    @staticmethod
+    def _parse_eval_result(content: str) -> Dict[str, Any]:
+        # Decode from the first '{' and stop at the end of the object —
+        # tolerates preambles and trailing text in one forward pass.
+        json_start = content.find('{')
+        if json_start == -1:
+            raise json.JSONDecodeError("No JSON object found", content, 0)
+
+        result, _ = _JSON_DECODER.raw_decode(content, json_start)
+        logger.info(f"Evaluation complete. Pass: {result.get('overall_pass')}")
+        return result
+
+    @staticmethod
+    def _eval_error(e: Exception) -> Dict[str, Any]:
+        logger.error(f"Evaluation failed: {e}")
+        return {
+            "citation_accuracy": 0,
+            "completeness": 0,
+            "professional_tone": 0,
+            "overall_pass": False,
+            "feedback": f"Evaluation script error: {str(e)}"
+        }
 
 def run_sample_evals():
     """Run a basic sanity check on the eval pipeline using a mock gold standard."""
-    import time
-    print("Waiting 40 seconds to clear Gemini Pro rate limits...")
-    time.sleep(40)
-
     evaluator = EvalPipeline()
 
     # Mock data representing a typical Laneway Suite FSI/Coverage deficiency
@@ -136,22 +259,24 @@ Please refer to revised Site Plan (Sheet A101) and updated Zoning Matrix.""",
         "agent_reasoning": "Identified the 'lesser of' dual-constraint. The 45sqm cap is the governing limit for this lot size. Cited both general lot coverage and specific laneway floor area sections."
     }
 
-    print("--- Running Evaluation on GOOD Response ---")
-    good_result = evaluator.evaluate_response(mock_deficiency, mock_good_response, mock_gold_citations)
-    print(json.dumps(good_result, indent=2))
+    # All three evaluations overlap on the event loop — total wall time is
+    # roughly one call's latency instead of three calls plus sleeps.
+    async def _run_all():
+        return await asyncio.gather(
+            evaluator.evaluate_response_async(mock_deficiency, mock_good_response, mock_gold_citations),
+            evaluator.evaluate_response_async(mock_deficiency, mock_peng_response, mock_gold_citations),
+            evaluator.evaluate_response_async(mock_deficiency, mock_bad_response, mock_gold_citations),
+        )
 
-    print("\nWaiting 20 seconds before next evaluation...")
-    time.sleep(20)
+    good_result, peng_result, bad_result = asyncio.run(_run_all())
 
-    print("\n--- Running Evaluation on P.ENG. OPTIMIZED Response ---")
-    peng_result = evaluator.evaluate_response(mock_deficiency, mock_peng_response, mock_gold_citations)
-    print(json.dumps(peng_result, indent=2))
+    print("--- Evaluation of GOOD Response ---")
+    print(json.dumps(good_result, indent=2))
 
-    print("\nWaiting 20 seconds before next evaluation...")
-    time.sleep(20)
+    print("\n--- Evaluation of P.ENG. OPTIMIZED Response ---")
+    print(json.dumps(peng_result, indent=2))
 
-    print("\n--- Running Evaluation on BAD Response ---")
-    bad_result = evaluator.evaluate_response(mock_deficiency, mock_bad_response, mock_gold_citations)
+    print("\n--- Evaluation of BAD Response ---")
     print(json.dumps(bad_result, indent=2))
 
 def run_interactive_eval():
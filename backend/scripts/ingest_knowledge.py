@@ -1,12 +1,17 @@
 import asyncio
+import hashlib
+import io
 import os
 import re
 import glob
 import fitz  # PyMuPDF
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
+from concurrent.futures import ProcessPoolExecutor
 from google import genai
 from google.genai import types
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert
 
 import sys
 from pathlib import Path
@@ -25,121 +30,341 @@ if not API_KEY:
 
 client = genai.Client(api_key=API_KEY)
 
+# Caps concurrent embedding calls so a large PDF fans out without
+# tripping the Gemini requests-per-minute limit.
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "32"))
+_embed_sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+# Token bucket smoothing request submission to the per-minute quota —
+# requests queue here briefly instead of triggering 429 backoff storms.
+_limiter = AsyncLimiter(int(os.getenv("GEMINI_RPM", "60")), 60)
+
+# PDF decompression/layout is pure CPU; a process pool lets concurrent
+# files decode on separate cores instead of blocking the event loop.
+_extract_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Section headers like "## 150.8.20 Setbacks" / "### (1) Definition",
+# compiled once instead of per chunk_by_section call.
+_SECTION_RE = re.compile(r'^##\s+([\d\.]+)\s+(.*)')
+_SUBSECTION_RE = re.compile(r'^###\s+\(([\d\w]+)\)\s+(.*)')
+
+EMBED_MODEL = 'gemini-embedding-001'
+EMBED_DIM = 768
+
+# Persistent embedding cache: byline/section text repeats across bylaw
+# documents and re-runs delete + re-ingest, so byte-identical chunks skip
+# the API entirely. Keyed by (model, dim, text) like the parse caches in
+# app/services/pdf_parser.py.
+_EMBED_CACHE_DIR = os.path.join(".cache", "embeddings")
+
+# Collapses runs of whitespace before hashing so chunks that differ only
+# in line-wrapping or indentation dedupe to the same key.
+_WS_RE = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+def _embed_cache_key(text: str) -> str:
+    return hashlib.sha256(f"{EMBED_MODEL}|{EMBED_DIM}|{_normalize(text)}".encode()).hexdigest()
+
+def _embed_cache_get(key: str) -> np.ndarray | None:
+    path = os.path.join(_EMBED_CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            return np.asarray(orjson.loads(f.read()), dtype=np.float32)
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def _embed_cache_set(key: str, vector: np.ndarray) -> None:
+    try:
+        os.makedirs(_EMBED_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_EMBED_CACHE_DIR, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(vector, option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(tmp_path, path)  # atomic on POSIX
+    except OSError:
+        pass
+
 def chunk_by_section(text: str):
     """
     Splits text into chunks based on markdown headers (##, ###).
-    Returns a list of dictionaries with content and metadata.
+    Yields dictionaries with content and metadata one at a time, so
+    callers never hold every chunk string in memory at once — only the
+    section currently being accumulated is buffered.
     """
-    # Regex to find section headers like ## 150.8.20 Setbacks
-    # or ### (1) Definition
-    lines = text.split('\n')
-    chunks = []
     current_section = "General"
     current_subsection = ""
     current_content = []
-    
-    section_pattern = re.compile(r'^##\s+([\d\.]+)\s+(.*)')
-    subsection_pattern = re.compile(r'^###\s+\(([\d\w]+)\)\s+(.*)')
-
-    for line in lines:
-        section_match = section_pattern.match(line)
-        subsection_match = subsection_pattern.match(line)
-        
+
+    for line in io.StringIO(text):
+        line = line.rstrip('\n')
+        section_match = _SECTION_RE.match(line)
+        # A "##" match precludes a "###" match, so only scan once per line
+        subsection_match = None if section_match else _SUBSECTION_RE.match(line)
+
         if section_match:
-            # Save previous chunk
+            # Emit previous chunk
             if current_content:
-                chunks.append({
+                yield {
                     "content": '\n'.join(current_content).strip(),
                     "section": current_section,
                     "subsection": current_subsection
-                })
+                }
             current_section = section_match.group(1)
             current_subsection = ""
             current_content = [line]
         elif subsection_match:
-            # Save previous chunk if it has content beyond the header
+            # Emit previous chunk if it has content beyond the header
             if current_content:
-                chunks.append({
+                yield {
                     "content": '\n'.join(current_content).strip(),
                     "section": current_section,
                     "subsection": current_subsection
-                })
+                }
             current_subsection = subsection_match.group(1)
             current_content = [line]
         else:
             current_content.append(line)
-            
-    # Add final chunk
+
+    # Emit final chunk
     if current_content:
-        chunks.append({
+        yield {
             "content": '\n'.join(current_content).strip(),
             "section": current_section,
             "subsection": current_subsection
-        })
-        
-    return chunks
+        }
 
 def extract_text_from_file(file_path: str) -> str:
     """Extract text from a file (PDF, TXT, MD)."""
     ext = file_path.lower().split('.')[-1]
     if ext == 'pdf':
-        text = ""
+        # join() is linear in total text length; += on an immutable str
+        # re-copies the accumulated text every page.
         with fitz.open(file_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
+            return "".join(page.get_text("text") for page in doc)
     elif ext in ['txt', 'md']:
         with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
     else:
         return ""
 
-async def generate_embedding(text: str) -> list[float]:
-    """Uses Gemini text-embedding model to generate embeddings at 768 dimensions."""
-    res = await asyncio.to_thread(
-        client.models.embed_content,
-        model='gemini-embedding-001',
-        contents=text,
-        config=types.EmbedContentConfig(output_dimensionality=768)
+# In-flight embedding requests by cache key: concurrent callers with the
+# same text (headers, boilerplate) await one shared Future instead of all
+# firing duplicate API calls. Complements the disk cache, which only
+# helps once the first call has finished.
+_inflight: dict[str, asyncio.Future] = {}
+
+async def generate_embedding(text: str) -> np.ndarray:
+    """Uses Gemini text-embedding model to generate embeddings at 768 dimensions.
+
+    Returns a packed float32 ndarray (~3KB) instead of a Python float
+    list (~24KB with PyObject boxing); pgvector's type adapter accepts
+    ndarrays directly.
+    """
+    key = _embed_cache_key(text)
+    cached = _embed_cache_get(key)
+    if cached is not None:
+        return cached
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await pending
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        async with _limiter:
+            # Native async client — no worker thread per call, requests
+            # overlap directly on the event loop.
+            res = await client.aio.models.embed_content(
+                model=EMBED_MODEL,
+                contents=text,
+                config=types.EmbedContentConfig(output_dimensionality=EMBED_DIM)
+            )
+        vector = np.asarray(res.embeddings[0].values, dtype=np.float32)
+        _embed_cache_set(key, vector)
+        fut.set_result(vector)
+        return vector
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+def _split_cache_hits(texts: list[str]):
+    """Cache lookup shared by the batch paths: returns the cache keys, the
+    (partially filled) embedding slots, and the indices of unique misses —
+    duplicate texts are fetched once and fanned back out by key."""
+    keys = [_embed_cache_key(t) for t in texts]
+    embeddings: list[np.ndarray | None] = [_embed_cache_get(k) for k in keys]
+    misses = []
+    seen_keys = set()
+    for i, e in enumerate(embeddings):
+        if e is None and keys[i] not in seen_keys:
+            seen_keys.add(keys[i])
+            misses.append(i)
+    return keys, embeddings, misses
+
+async def generate_embeddings_batch(texts: list[str], batch: int = 100) -> list[np.ndarray]:
+    """Embeds many texts with one API call per `batch` texts.
+
+    embed_content accepts a list of contents, so 100 chunks cost one
+    round-trip instead of 100. Cached texts are served locally and only
+    the misses go to the API, then results are stitched back in input
+    order. Batches still go through the semaphore so concurrent files
+    share the same global cap.
+    """
+    keys, embeddings, misses = _split_cache_hits(texts)
+
+    async def _embed_group(group: list[str]) -> list[np.ndarray]:
+        async with _embed_sem, _limiter:
+            res = await client.aio.models.embed_content(
+                model=EMBED_MODEL,
+                contents=group,
+                config=types.EmbedContentConfig(output_dimensionality=EMBED_DIM)
+            )
+            return [np.asarray(e.values, dtype=np.float32) for e in res.embeddings]
+
+    groups = [misses[i:i + batch] for i in range(0, len(misses), batch)]
+    results = await asyncio.gather(
+        *(_embed_group([texts[i] for i in group]) for group in groups)
     )
-    return res.embeddings[0].values
+    fetched = {}
+    for group, group_embeddings in zip(groups, results):
+        for i, vector in zip(group, group_embeddings):
+            _embed_cache_set(keys[i], vector)
+            fetched[keys[i]] = vector
+    return [
+        e if e is not None else fetched[keys[i]]
+        for i, e in enumerate(embeddings)
+    ]
+
+# Batch API jobs finish whenever Google schedules them (up to 24h), so
+# polling can be leisurely.
+_BATCH_JOB_POLL_SECONDS = 30.0
+_BATCH_JOB_TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+async def generate_embeddings_batch_job(texts: list[str]) -> list[np.ndarray]:
+    """Embeds texts through the Gemini Batch API (EMBED_BATCH_MODE=1).
+
+    Batch jobs are billed at roughly half the interactive rate and are
+    exempt from per-minute quotas, at the cost of a scheduling delay —
+    the right trade for overnight corpus rebuilds, not interactive runs.
+    All misses go up as one job; results come back keyed by position.
+    """
+    keys, embeddings, misses = _split_cache_hits(texts)
+
+    if misses:
+        # Embedding jobs go through the dedicated create_embeddings
+        # endpoint — batches.create is generate_content-only and rejects
+        # EmbedContentConfig fields at validation time.
+        job = await client.aio.batches.create_embeddings(
+            model=EMBED_MODEL,
+            src=types.EmbeddingsBatchJobSource(
+                inlined_requests=types.EmbedContentBatch(
+                    contents=[texts[i] for i in misses],
+                    config=types.EmbedContentConfig(output_dimensionality=EMBED_DIM),
+                )
+            ),
+        )
+        print(f"Submitted embedding batch job {job.name} ({len(misses)} texts)")
+        while job.state.name not in _BATCH_JOB_TERMINAL_STATES:
+            await asyncio.sleep(_BATCH_JOB_POLL_SECONDS)
+            job = await client.aio.batches.get(name=job.name)
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Embedding batch job {job.name} ended in {job.state.name}")
+
+        fetched = {}
+        for i, inlined in zip(misses, job.dest.inlined_embed_content_responses):
+            vector = np.asarray(
+                inlined.response.embedding.values, dtype=np.float32
+            )
+            _embed_cache_set(keys[i], vector)
+            fetched[keys[i]] = vector
+    else:
+        fetched = {}
+
+    return [
+        e if e is not None else fetched[keys[i]]
+        for i, e in enumerate(embeddings)
+    ]
+
+async def ingest_file(file_path: str):
+    """Ingest a single file using section-aware chunking.
 
-async def ingest_file(file_path: str, session: AsyncSession):
-    """Ingest a single file using section-aware chunking."""
+    Opens its own session so files can be ingested concurrently —
+    AsyncSession is not safe to share across tasks.
+    """
     print(f"Processing: {file_path}")
     file_name = os.path.basename(file_path)
 
-    # For development, we delete existing chunks for this file to allow re-ingestion with new logic
-    stmt_del = delete(KnowledgeChunkDB).where(KnowledgeChunkDB.file_name == file_name)
-    await session.execute(stmt_del)
-
-    text = extract_text_from_file(file_path)
+    text = await asyncio.get_running_loop().run_in_executor(
+        _extract_pool, extract_text_from_file, file_path
+    )
     if not text.strip():
         print(f"Skipping {file_name} because it's empty or unsupported.")
         return
 
-    chunks = chunk_by_section(text)
-    print(f"Generated {len(chunks)} section-based chunks for {file_name}.")
-
-    for idx, chunk_data in enumerate(chunks):
+    # Embedding is network-bound, so chunks are batched into as few API
+    # calls as possible instead of one round-trip per chunk. The section
+    # generator streams chunks out as they are cut, so only the kept,
+    # non-empty ones are ever materialized. Exact duplicates (normalized
+    # for whitespace — repeated headers and boilerplate are common in
+    # bylaw documents) are dropped before anything is embedded or stored.
+    indexed = []
+    seen_content = set()
+    for idx, chunk_data in enumerate(chunk_by_section(text)):
         content = chunk_data["content"]
-        if not content.strip(): continue
-        
-        embedding = await generate_embedding(content)
-        chunk_db = KnowledgeChunkDB(
-            file_name=file_name,
-            chunk_index=idx,
-            content=content,
-            metadata_json={
-                "source": file_name, 
+        if not content.strip():
+            continue
+        content_hash = hashlib.sha256(_normalize(content).encode()).hexdigest()
+        if content_hash in seen_content:
+            continue
+        seen_content.add(content_hash)
+        indexed.append((idx, chunk_data))
+    print(f"Generated {len(indexed)} section-based chunks for {file_name}.")
+    # EMBED_BATCH_MODE=1 routes through the offline Batch API (~50%
+    # cheaper, no RPM limits, but hours of scheduling delay) — meant for
+    # overnight rebuilds, not interactive runs.
+    embed = (
+        generate_embeddings_batch_job
+        if os.getenv("EMBED_BATCH_MODE") == "1"
+        else generate_embeddings_batch
+    )
+    embeddings = await embed([chunk_data["content"] for _, chunk_data in indexed])
+
+    # Plain dicts + a single bulk INSERT…VALUES instead of ORM add() per
+    # row — no per-row unit-of-work bookkeeping or statement round-trips.
+    rows = [
+        {
+            "file_name": file_name,
+            "chunk_index": idx,
+            "content": chunk_data["content"],
+            "metadata_json": {
+                "source": file_name,
                 "section": chunk_data["section"],
                 "subsection": chunk_data["subsection"]
             },
-            embedding=embedding
-        )
-        session.add(chunk_db)
+            "embedding": embedding,
+        }
+        for (idx, chunk_data), embedding in zip(indexed, embeddings)
+    ]
+
+    async with AsyncSessionLocal() as session:
+        # For development, we delete existing chunks for this file to allow re-ingestion with new logic
+        stmt_del = delete(KnowledgeChunkDB).where(KnowledgeChunkDB.file_name == file_name)
+        await session.execute(stmt_del)
 
-    await session.commit()
+        if rows:
+            await session.execute(insert(KnowledgeChunkDB), rows)
+
+        await session.commit()
     print(f"Successfully ingested {file_name} with section metadata.")
 
 async def main():
@@ -158,9 +383,9 @@ async def main():
         print(f"No files found in {data_dir}.")
         return
 
-    async with AsyncSessionLocal() as session:
-        for file in files:
-            await ingest_file(file, session)
+    # Files fan out concurrently, each with its own session; the embedding
+    # semaphore keeps total API concurrency capped regardless of file count.
+    await asyncio.gather(*(ingest_file(file) for file in files))
 
 if __name__ == "__main__":
     asyncio.run(main())
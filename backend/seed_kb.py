@@ -54,30 +54,34 @@ TORONTO_BYLAWS = [
 
 async def seed_db():
     async with AsyncSessionLocal() as session:
-        # Check if table has data
-        result = await session.execute(text("SELECT COUNT(*) FROM knowledge_chunks"))
-        count = result.scalar()
-        if count > 0:
+        # Check if table has data — EXISTS stops at the first row instead
+        # of counting (and transferring nothing but a bool).
+        result = await session.execute(text("SELECT EXISTS (SELECT 1 FROM knowledge_chunks)"))
+        if result.scalar():
             print("Knowledge base already seeded. Exiting.")
             return
 
         print("Seeding Knowledge Base with Toronto By-Laws...")
-        for i, b in enumerate(TORONTO_BYLAWS):
-            print(f"Embedding {b['category']} - {b['subcategory']} ...")
-            if kb_service:
-                vector = await kb_service.get_embedding(b['content'])
-            else:
-                vector = [0.0] * 768
-                
-            chunk = KnowledgeChunkDB(
+        if kb_service:
+            # Embeddings are network-bound — request them all concurrently
+            # instead of one round-trip per by-law.
+            vectors = await asyncio.gather(
+                *(kb_service.get_embedding(b['content']) for b in TORONTO_BYLAWS)
+            )
+        else:
+            vectors = [[0.0] * 768 for _ in TORONTO_BYLAWS]
+
+        session.add_all(
+            KnowledgeChunkDB(
                 file_name="toronto_city_bylaws.txt",
                 chunk_index=i,
                 content=b['content'],
                 metadata_json={"category": b['category'], "subcategory": b['subcategory']},
                 embedding=vector
             )
-            session.add(chunk)
-        
+            for i, (b, vector) in enumerate(zip(TORONTO_BYLAWS, vectors))
+        )
+
         await session.commit()
         print("Knowledge base seed complete.")
 
@@ -1,34 +1,167 @@
 import asyncio
 import uuid
+from datetime import datetime
+from sqlalchemy import insert, literal, select, union_all
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from app.db.database import get_db, AsyncSessionLocal
+from app.db.database import get_db, engine, AsyncSessionLocal
 from app.models.db_models import PermitSessionDB, DeficiencyItemDB
 from app.models.domain import SessionStatus, SuiteType, DeficiencyCategory
 
-async def test_insert():
+# Column order for the COPY fast path below; enums go over as their
+# stored names and client-side defaults are filled in explicitly since
+# COPY bypasses the ORM.
+_SESSION_COPY_COLUMNS = (
+    "id", "status", "property_address", "suite_type",
+    "laneway_abutment_length", "is_former_municipal_zoning", "created_at",
+)
+_DEFICIENCY_COPY_COLUMNS = (
+    "id", "session_id", "category", "raw_notice_text",
+    "extracted_action", "agent_confidence", "order_index",
+)
+
+# Enum members resolved once instead of per row-dict; the columns are
+# native Postgres enums, so the instances go over as-is with no .value
+# coercion in Python.
+_STATUS_ANALYZING = SessionStatus.ANALYZING
+_SUITE_GARDEN = SuiteType.GARDEN
+_CATEGORY_ZONING = DeficiencyCategory.ZONING
+
+async def seed(session_rows: list[dict], deficiency_rows: list[dict]):
+    """Bulk-seeds permit sessions and their deficiencies.
+
+    Two executemany INSERTs in one transaction instead of an ORM flush
+    per row, so scaled-up fixture seeding costs two round-trips total.
+    Deficiency rows must carry their session_id FK already.
+    """
     async with AsyncSessionLocal() as session:
-        db_session = PermitSessionDB(
-            id=uuid.uuid4(),
-            property_address="123 Test St",
-            suite_type=SuiteType.GARDEN,
-            laneway_abutment_length=None,
-            status=SessionStatus.ANALYZING,
+        async with session.begin():
+            if session_rows:
+                await session.execute(insert(PermitSessionDB), session_rows)
+            if deficiency_rows:
+                await session.execute(insert(DeficiencyItemDB), deficiency_rows)
+
+async def seed_copy(session_rows: list[dict], deficiency_rows: list[dict]):
+    """COPY-based fast path for large seeds.
+
+    COPY FROM STDIN skips per-statement parse/bind entirely — an order of
+    magnitude faster than even batched INSERTs once row counts get large.
+    Postgres-only; other dialects fall back to seed().
+    """
+    if engine.dialect.name != "postgresql":
+        await seed(session_rows, deficiency_rows)
+        return
+
+    async with engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        asyncpg_conn = raw.driver_connection
+        if session_rows:
+            await asyncpg_conn.copy_records_to_table(
+                "permit_sessions",
+                records=[
+                    (
+                        r["id"],
+                        r["status"].name,
+                        r["property_address"],
+                        r["suite_type"].name,
+                        r.get("laneway_abutment_length"),
+                        r.get("is_former_municipal_zoning", False),
+                        r.get("created_at") or datetime.utcnow(),
+                    )
+                    for r in session_rows
+                ],
+                columns=list(_SESSION_COPY_COLUMNS),
+            )
+        if deficiency_rows:
+            await asyncpg_conn.copy_records_to_table(
+                "deficiency_items",
+                records=[
+                    (
+                        r["id"],
+                        r["session_id"],
+                        r["category"].name,
+                        r["raw_notice_text"],
+                        r["extracted_action"],
+                        r.get("agent_confidence", 1.0),
+                        r["order_index"],
+                    )
+                    for r in deficiency_rows
+                ],
+                columns=list(_DEFICIENCY_COPY_COLUMNS),
+            )
+
+async def seed_cte(session_row: dict, deficiency_rows: list[dict]):
+    """Inserts one session and its deficiencies in a single statement.
+
+    A data-modifying CTE — WITH inserted AS (INSERT ... RETURNING id)
+    INSERT INTO deficiency_items SELECT ... — collapses the parent+child
+    pair into one round-trip, so the FK never travels through Python.
+    Postgres-only; other dialects fall back to the two-statement seed().
+    Deficiency rows here omit session_id, which the CTE supplies.
+    """
+    if engine.dialect.name != "postgresql":
+        await seed(
+            [session_row],
+            [{**r, "session_id": session_row["id"]} for r in deficiency_rows],
         )
-        
-        db_def = DeficiencyItemDB(
-            id=uuid.uuid4(),
-            session_id=db_session.id,
-            category=DeficiencyCategory.ZONING,
-            raw_notice_text="Test def",
-            extracted_action="Test action",
-            agent_confidence=0.99,
-            order_index=0,
+        return
+
+    parent_cte = (
+        insert(PermitSessionDB)
+        .values(**session_row)
+        .returning(PermitSessionDB.id)
+        .cte("inserted_session")
+    )
+
+    def _lit(col: str, value):
+        return literal(value, DeficiencyItemDB.__table__.c[col].type)
+
+    branches = [
+        select(
+            _lit("id", r["id"]),
+            parent_cte.c.id,
+            _lit("category", r["category"]),
+            _lit("raw_notice_text", r["raw_notice_text"]),
+            _lit("extracted_action", r["extracted_action"]),
+            _lit("agent_confidence", r.get("agent_confidence", 1.0)),
+            _lit("order_index", r["order_index"]),
         )
-        db_session.deficiencies.append(db_def)
+        for r in deficiency_rows
+    ]
+    stmt = insert(DeficiencyItemDB).from_select(
+        list(_DEFICIENCY_COPY_COLUMNS),
+        branches[0] if len(branches) == 1 else union_all(*branches),
+    )
+
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(stmt)
+
+async def test_insert():
+    # Regression guard: the enum columns must stay native Postgres enums,
+    # otherwise SQLAlchemy coerces to/from strings in Python on every row.
+    assert PermitSessionDB.__table__.c.suite_type.type.native_enum
 
-        session.add(db_session)
-        await session.commit()
-        print(f"Inserted PermitSession: {db_session.id} with 1 deficiency")
+    session_id = uuid.uuid4()
+    await seed_cte(
+        {
+            "id": session_id,
+            "property_address": "123 Test St",
+            "suite_type": _SUITE_GARDEN,
+            "laneway_abutment_length": None,
+            "status": _STATUS_ANALYZING,
+        },
+        [
+            {
+                "id": uuid.uuid4(),
+                "category": _CATEGORY_ZONING,
+                "raw_notice_text": "Test def",
+                "extracted_action": "Test action",
+                "agent_confidence": 0.99,
+                "order_index": 0,
+            }
+        ],
+    )
+    print(f"Inserted PermitSession: {session_id} with 1 deficiency")
 
 if __name__ == "__main__":
     asyncio.run(test_insert())
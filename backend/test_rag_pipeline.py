@@ -1,40 +1,88 @@
+import asyncio
+import atexit
+import io
 import sys
 import httpx
 import json
 
-def test():
-    print("Testing pipeline/run...")
-    url = "http://localhost:8000/api/v1/pipeline/run"
-
-    data = {
-        "property_address": "123 RAG Test St",
-        "suite_type": "GARDEN",
-        "laneway_abutment_length": "10.0"
-    }
-
-    # Create a dummy PDF 
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n"
-    
-    try:
-        response = httpx.post(
-            url,
-            data=data,
-            files={"file": ("dummy.pdf", pdf_content, "application/pdf")},
-            timeout=120.0
+URL = "http://localhost:8000/api/v1/pipeline/run"
+
+DATA = {
+    "property_address": "123 RAG Test St",
+    "suite_type": "GARDEN",
+    "laneway_abutment_length": "10.0"
+}
+
+# Dummy PDF payload allocated once per process and shared by every
+# request; BytesIO(PDF_CONTENT) below shares this buffer copy-on-write,
+# so concurrent uploads don't duplicate it.
+PDF_CONTENT = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n"
+
+def _report(response):
+    if isinstance(response, Exception):
+        print("Error:", response)
+        return
+
+    print("Status Code:", response.status_code)
+    if response.status_code == 200:
+        res_json = response.json()
+        for r in res_json.get("results", []):
+            agent = r.get("agent")
+            reasoning = r.get("response", {}).get("agent_reasoning")
+            print(f"Agent: {agent}\nReasoning: {reasoning}\n")
+    else:
+        print("Response:", response.text)
+
+# Shared sync client for one-shot runs; keep-alive amortizes the TCP
+# handshake when test_once() is called in a loop. Created lazily so the
+# async path never opens a connection pool it won't use.
+_sync_client: httpx.Client | None = None
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(http2=True, timeout=120.0)
+        atexit.register(_sync_client.close)
+    return _sync_client
+
+def test_once():
+    """Fires one pipeline run synchronously over the shared client."""
+    response = _get_sync_client().post(
+        URL,
+        data=DATA,
+        files={"file": ("dummy.pdf", io.BytesIO(PDF_CONTENT), "application/pdf")},
+    )
+    _report(response)
+
+async def test(n: int = 1):
+    """Fires n concurrent pipeline runs over one pooled HTTP/2 client.
+
+    A single AsyncClient keeps connections alive across requests, so the
+    TCP+TLS handshake is paid once per connection instead of per call —
+    which matters when this smoke test is looped as a load driver.
+    """
+    print(f"Testing pipeline/run with {n} concurrent request(s)...")
+    limits = httpx.Limits(max_connections=n)
+    async with httpx.AsyncClient(http2=True, timeout=120.0, limits=limits) as client:
+        responses = await asyncio.gather(
+            *(
+                # A file-like object makes httpx stream the multipart body
+                # in chunks instead of materializing a second encoded copy
+                # of the payload per request — constant memory no matter
+                # how large the PDF gets.
+                client.post(
+                    URL,
+                    data=DATA,
+                    files={"file": ("dummy.pdf", io.BytesIO(PDF_CONTENT), "application/pdf")},
+                )
+                for _ in range(n)
+            ),
+            return_exceptions=True,
         )
-        print("Status Code:", response.status_code)
-        
-        if response.status_code == 200:
-            res_json = response.json()
-            for r in res_json.get("results", []):
-                agent = r.get("agent")
-                reasoning = r.get("response", {}).get("agent_reasoning")
-                print(f"Agent: {agent}\nReasoning: {reasoning}\n")
-        else:
-            print("Response:", response.text)
-            
-    except Exception as e:
-        print("Error:", e)
+
+    for response in responses:
+        _report(response)
 
 if __name__ == "__main__":
-    test()
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    asyncio.run(test(concurrency))
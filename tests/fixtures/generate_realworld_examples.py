@@ -1,43 +1,60 @@
 #!/usr/bin/env python3
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+# Styles and colors are identical for every notice, so they're built once
+# at import instead of per create_notice call.
+city_blue = colors.HexColor("#003F72")
+city_red  = colors.HexColor("#C8102E")
+
+header_style = ParagraphStyle("header", fontSize=18, textColor=city_blue, fontName="Helvetica-Bold", spaceAfter=2)
+sub_style = ParagraphStyle("sub", fontSize=10, textColor=city_blue, fontName="Helvetica", spaceAfter=2)
+title_style = ParagraphStyle("title", fontSize=14, textColor=colors.black, fontName="Helvetica-Bold", alignment=TA_CENTER, spaceAfter=4)
+body_style = ParagraphStyle("body", fontSize=9, leading=14, fontName="Helvetica", spaceAfter=6)
+deficiency_title_style = ParagraphStyle("def_title", fontSize=10, fontName="Helvetica-Bold", textColor=city_red, spaceAfter=2, spaceBefore=8)
+def_body_style = ParagraphStyle("def_body", fontSize=9, leading=13, fontName="Helvetica", leftIndent=12, spaceAfter=4)
+label_style = ParagraphStyle("label", fontSize=9, fontName="Helvetica-Bold", spaceAfter=2)
+
+# Info-block labels are identical across notices and render as plain
+# strings: every cell is single-line, so bolding via TableStyle FONTNAME
+# commands skips ReportLab's per-cell Paragraph parse entirely.
+_LBL_APP_NUM = "Application Number:"
+_LBL_NOTICE_DATE = "Notice Date:"
+_LBL_ADDRESS = "Property Address:"
+_LBL_WARD = "Ward:"
+_LBL_APP_TYPE = "Application Type:"
+_LBL_EXAMINER_FILE = "Examiner File:"
+_LBL_OWNER_AGENT = "Owner/Agent:"
+_LBL_ZONING = "Zoning:"
+
+_INFO_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#F5F7FA")),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#CCCCCC")),
+    ("PADDING", (0, 0), (-1, -1), 5),
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+    ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+])
+
 def create_notice(output_path, info_dict, sections_dict):
     """
     Generate an examiner's notice PDF.
     sections_dict is { "SECTION Title": [ ("Code", "Title", "Text"), ... ] }
     """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=letter,
-        rightMargin=0.75 * inch,
-        leftMargin=0.75 * inch,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-    )
 
-    styles = getSampleStyleSheet()
     story = []
 
-    city_blue = colors.HexColor("#003F72")
-    city_red  = colors.HexColor("#C8102E")
-
-    header_style = ParagraphStyle("header", fontSize=18, textColor=city_blue, fontName="Helvetica-Bold", spaceAfter=2)
-    sub_style = ParagraphStyle("sub", fontSize=10, textColor=city_blue, fontName="Helvetica", spaceAfter=2)
-    title_style = ParagraphStyle("title", fontSize=14, textColor=colors.black, fontName="Helvetica-Bold", alignment=TA_CENTER, spaceAfter=4)
-    body_style = ParagraphStyle("body", fontSize=9, leading=14, fontName="Helvetica", spaceAfter=6)
-    deficiency_title_style = ParagraphStyle("def_title", fontSize=10, fontName="Helvetica-Bold", textColor=city_red, spaceAfter=2, spaceBefore=8)
-    def_body_style = ParagraphStyle("def_body", fontSize=9, leading=13, fontName="Helvetica", leftIndent=12, spaceAfter=4)
-    label_style = ParagraphStyle("label", fontSize=9, fontName="Helvetica-Bold", spaceAfter=2)
-
     story.append(Paragraph("City of Toronto", header_style))
     story.append(Paragraph("Toronto Building — Plans Examination Branch", sub_style))
     story.append(HRFlowable(width="100%", thickness=2, color=city_blue, spaceAfter=10))
@@ -46,18 +63,21 @@ def create_notice(output_path, info_dict, sections_dict):
     story.append(HRFlowable(width="100%", thickness=1, color=colors.grey, spaceAfter=10))
 
     info_data = [
-        [Paragraph("<b>Application Number:</b>", body_style), Paragraph(info_dict.get('app_num', '12345'), body_style), Paragraph("<b>Notice Date:</b>", body_style), Paragraph(info_dict.get('date', 'Today'), body_style)],
-        [Paragraph("<b>Property Address:</b>", body_style), Paragraph(info_dict.get('address', '123 Fake St'), body_style), Paragraph("<b>Ward:</b>", body_style), Paragraph("Ward 9 — Davenport", body_style)],
-        [Paragraph("<b>Application Type:</b>", body_style), Paragraph(info_dict.get('type', 'Building Permit'), body_style), Paragraph("<b>Examiner File:</b>", body_style), Paragraph("BP-202X", body_style)],
-        [Paragraph("<b>Owner/Agent:</b>", body_style), Paragraph(info_dict.get('agent', 'Jane Doe'), body_style), Paragraph("<b>Zoning:</b>", body_style), Paragraph("RD", body_style)],
+        [_LBL_APP_NUM, info_dict.get('app_num', '12345'), _LBL_NOTICE_DATE, info_dict.get('date', 'Today')],
+        [_LBL_ADDRESS, info_dict.get('address', '123 Fake St'), _LBL_WARD, "Ward 9 — Davenport"],
+        [_LBL_APP_TYPE, info_dict.get('type', 'Building Permit'), _LBL_EXAMINER_FILE, "BP-202X"],
+        [_LBL_OWNER_AGENT, info_dict.get('agent', 'Jane Doe'), _LBL_ZONING, "RD"],
     ]
-    info_table = Table(info_data, colWidths=[1.5*inch, 2.6*inch, 1.3*inch, 2.1*inch])
-    info_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#F5F7FA")),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#CCCCCC")),
-        ("PADDING", (0, 0), (-1, -1), 5),
-    ]))
+    # Fixed row heights plus repeatRows=0 keep layout out of ReportLab's
+    # auto-sizing wrap/split pass — every dimension is known up front.
+    info_table = Table(
+        info_data,
+        colWidths=[1.5*inch, 2.6*inch, 1.3*inch, 2.1*inch],
+        rowHeights=[0.25*inch] * 4,
+        repeatRows=0,
+        splitByRow=1,
+    )
+    info_table.setStyle(_INFO_TABLE_STYLE)
     story.append(info_table)
     story.append(Spacer(1, 12))
 
@@ -74,14 +94,42 @@ def create_notice(output_path, info_dict, sections_dict):
             story.append(Spacer(1, 4))
         story.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceAfter=4))
 
-    doc.build(story)
+    # Hand ReportLab a pre-opened 1MB-buffered handle so output streams
+    # to disk as it's produced instead of accumulating the whole PDF in
+    # memory before a single flush.
+    with open(output_path, "wb", buffering=1 << 20) as f:
+        doc = SimpleDocTemplate(
+            f,
+            pagesize=letter,
+            rightMargin=0.75 * inch,
+            leftMargin=0.75 * inch,
+            topMargin=0.75 * inch,
+            bottomMargin=0.75 * inch,
+        )
+        doc.build(story)
     print(f"Generated: {os.path.abspath(output_path)}")
 
-def generate_all():
+def create_notices(specs):
+    """Renders a batch of (path, info, sections) specs in this process.
+
+    ReportLab's import-time font registration and the module-scope styles
+    are paid once per process, so an in-process batch amortizes that
+    setup across every notice — the right choice when spawning the
+    process pool costs more than the rendering itself.
+    """
+    for output_path, info_dict, sections_dict in specs:
+        create_notice(output_path, info_dict, sections_dict)
+
+def _render(spec):
+    """Process-pool worker: renders one (path, info, sections) spec."""
+    output_path, info_dict, sections_dict = spec
+    create_notice(output_path, info_dict, sections_dict)
+
+def _fixture_specs():
     docs_dir = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "realworld_examples")
-    
+    return [
     # 1. Laneway Suite Zoning Example
-    create_notice(
+    (
         os.path.join(docs_dir, "ex1_laneway_zoning_issues.pdf"),
         {
             "app_num": "24 159932 BLD 00 LS",
@@ -108,10 +156,10 @@ def generate_all():
                 )
             ]
         }
-    )
+    ),
 
     # 2. Garden Suite OBC & Fire Example
-    create_notice(
+    (
         os.path.join(docs_dir, "ex2_garden_suite_obc_fire.pdf"),
         {
             "app_num": "24 238122 BLD 00 GS",
@@ -140,10 +188,10 @@ def generate_all():
                 )
             ]
         }
-    )
+    ),
 
     # 3. Comprehensive Refusal Example
-    create_notice(
+    (
         os.path.join(docs_dir, "ex3_comprehensive_deficiency_report.pdf"),
         {
             "app_num": "25 101010 BLD 00 RS",
@@ -170,7 +218,15 @@ def generate_all():
                  )
              ]
         }
-    )
+    ),
+    ]
+
+def generate_all():
+    # Paragraph layout and table flow are CPU-bound pure Python, so the
+    # fixtures render on separate cores instead of serializing on one.
+    specs = _fixture_specs()
+    with ProcessPoolExecutor(max_workers=min(len(specs), os.cpu_count() or 1)) as ex:
+        list(ex.map(_render, specs))
 
 if __name__ == "__main__":
     generate_all()